@@ -4,9 +4,11 @@ Simple CMDB - A lightweight Configuration Management Database
 Using SQLite for storage and Flask for web interface
 """
 
-from flask import Flask, render_template, request, jsonify, redirect, url_for, send_file
+from flask import Flask, Response, render_template, request, jsonify, redirect, url_for
+from flask.json.provider import DefaultJSONProvider
+from flask_caching import Cache
 import sqlite3
-import json
+import orjson
 from datetime import datetime
 import os
 import psutil
@@ -16,12 +18,392 @@ import platform
 from typing import Dict, List, Optional
 import csv
 import io
+import queue
+import threading
+import heapq
+import time
+import zlib
+import atexit
+import signal
+import sys
+from contextlib import contextmanager
+
+class OrjsonProvider(DefaultJSONProvider):
+    """JSON provider that encodes and decodes with orjson"""
+
+    def dumps(self, obj, **kwargs):
+        option = orjson.OPT_NON_STR_KEYS
+        if kwargs.get('sort_keys', self.sort_keys):
+            option |= orjson.OPT_SORT_KEYS
+        if kwargs.get('indent'):
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, default=self.default, option=option).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
 
 app = Flask(__name__)
+app.json = OrjsonProvider(app)
 app.config['SECRET_KEY'] = 'cmdb-secret-key-change-in-production'
 
+# Read-mostly list and stats pages are cached in-process and cleared on any
+# write; a read racing a write can re-cache old data for up to CACHE_TIMEOUT
+cache = Cache(app, config={
+    'CACHE_TYPE': 'SimpleCache',
+    'CACHE_DEFAULT_TIMEOUT': int(os.environ.get('CACHE_TIMEOUT', 30))
+})
+
 # Database setup
-DB_PATH = 'cmdb.db'
+DB_PATH = os.environ.get('DATABASE_PATH', 'cmdb.db')
+DB_POOL_SIZE = int(os.environ.get('DB_POOL_SIZE', 8))
+
+# Applied to every pooled connection when it is opened
+CONNECTION_PRAGMAS = [
+    'PRAGMA journal_mode=WAL',
+    'PRAGMA synchronous=NORMAL',
+    'PRAGMA temp_store=MEMORY',
+    'PRAGMA cache_size=-64000',
+    'PRAGMA mmap_size=268435456',
+    'PRAGMA foreign_keys=ON',
+]
+
+class ConnectionPool:
+    """Fixed-size pool of SQLite connections shared by all request threads.
+
+    Connections are opened lazily (so importing the app does not create the
+    database file) and then kept open for reuse, keeping SQLite's page cache
+    and statement cache warm between requests.
+    """
+
+    def __init__(self, db_path, size=DB_POOL_SIZE):
+        self.db_path = db_path
+        self.size = size
+        self._idle = queue.Queue(maxsize=size)
+        self._opened = 0
+        self._lock = threading.Lock()
+
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, check_same_thread=False, cached_statements=256)
+        conn.row_factory = sqlite3.Row
+        for pragma in CONNECTION_PRAGMAS:
+            conn.execute(pragma)
+        return conn
+
+    def get(self):
+        """Take an idle connection, opening a new one while under the pool size"""
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+
+        with self._lock:
+            if self._opened < self.size:
+                conn = self._connect()
+                self._opened += 1
+                return conn
+
+        return self._idle.get()
+
+    def put(self, conn):
+        """Return a connection to the pool"""
+        self._idle.put(conn)
+
+    def close(self):
+        """Checkpoint the WAL into the main database file and close idle connections"""
+        while True:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                break
+
+            try:
+                conn.execute('PRAGMA wal_checkpoint(TRUNCATE)')
+            finally:
+                conn.close()
+                with self._lock:
+                    self._opened -= 1
+
+pool = ConnectionPool(DB_PATH)
+
+# Pooled connections stay open, so flush the WAL back into the database on exit
+atexit.register(pool.close)
+
+@contextmanager
+def get_conn():
+    """Borrow a pooled connection, committing on success and rolling back on error"""
+    conn = pool.get()
+    try:
+        yield conn
+        conn.commit()
+    except BaseException:
+        conn.rollback()
+        raise
+    finally:
+        pool.put(conn)
+
+# SQL statements, kept as constants so each pooled connection's statement
+# cache can reuse the prepared query across requests
+SQL_DASHBOARD_COUNTS = '''
+    SELECT (SELECT COUNT(*) FROM servers) AS servers,
+           (SELECT COUNT(*) FROM applications) AS applications,
+           (SELECT COUNT(*) FROM services) AS services,
+           (SELECT COUNT(*) FROM dependencies) AS dependencies
+'''
+
+SQL_RECENT_SERVERS = '''
+    SELECT id, hostname, ip_address, os_type, environment, status, created_at
+    FROM servers
+    ORDER BY created_at DESC
+    LIMIT 5
+'''
+
+SQL_ALL_SERVERS = 'SELECT * FROM servers ORDER BY hostname'
+
+SQL_SERVER_BY_ID = 'SELECT * FROM servers WHERE id = ?'
+
+SQL_SERVER_SERVICES = '''
+    SELECT s.*, a.name as app_name
+    FROM services s
+    LEFT JOIN applications a ON s.application_id = a.id
+    WHERE s.server_id = ?
+'''
+
+SQL_ALL_APPLICATIONS = 'SELECT * FROM applications ORDER BY name'
+
+SQL_APPLICATION_BY_ID = 'SELECT * FROM applications WHERE id = ?'
+
+SQL_APPLICATION_SERVICES = '''
+    SELECT s.*, srv.hostname
+    FROM services s
+    LEFT JOIN servers srv ON s.server_id = srv.id
+    WHERE s.application_id = ?
+'''
+
+SQL_SERVICES_WITH_JOINS = '''
+    SELECT s.*, srv.hostname, a.name as app_name
+    FROM services s
+    LEFT JOIN servers srv ON s.server_id = srv.id
+    LEFT JOIN applications a ON s.application_id = a.id
+    ORDER BY s.service_name
+'''
+
+SQL_SERVICE_BY_ID = '''
+    SELECT s.*, srv.hostname, srv.ip_address, a.name as app_name
+    FROM services s
+    LEFT JOIN servers srv ON s.server_id = srv.id
+    LEFT JOIN applications a ON s.application_id = a.id
+    WHERE s.id = ?
+'''
+
+SQL_SERVICE_DEPS_FROM = '''
+    SELECT d.*, s2.service_name as target_name
+    FROM dependencies d
+    LEFT JOIN services s2 ON d.target_service_id = s2.id
+    WHERE d.source_service_id = ?
+'''
+
+SQL_SERVICE_DEPS_TO = '''
+    SELECT d.*, s1.service_name as source_name
+    FROM dependencies d
+    LEFT JOIN services s1 ON d.source_service_id = s1.id
+    WHERE d.target_service_id = ?
+'''
+
+SQL_DEPS_FULL_JOIN = '''
+    SELECT d.id, d.dependency_type, d.description,
+           s1.service_name as source_name,
+           s2.service_name as target_name
+    FROM dependencies d
+    LEFT JOIN services s1 ON d.source_service_id = s1.id
+    LEFT JOIN services s2 ON d.target_service_id = s2.id
+    ORDER BY s1.service_name, s2.service_name
+'''
+
+SQL_ALL_SERVICES = 'SELECT * FROM services ORDER BY service_name'
+
+SQL_CRITICAL_SERVICES = '''
+    SELECT s.service_name as name, COUNT(d.id) as dep_count
+    FROM services s
+    JOIN dependencies d ON s.id = d.target_service_id
+    GROUP BY s.id
+    ORDER BY dep_count DESC
+    LIMIT 5
+'''
+
+SQL_DEPENDENT_SERVICES = '''
+    SELECT s.service_name as name, COUNT(d.id) as dep_count
+    FROM services s
+    JOIN dependencies d ON s.id = d.source_service_id
+    GROUP BY s.id
+    ORDER BY dep_count DESC
+    LIMIT 5
+'''
+
+SQL_UPSERT_DISCOVERED_SERVER = '''
+    INSERT INTO servers
+    (hostname, ip_address, os_type, os_version, cpu_cores, memory_gb, disk_gb, last_seen, status)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, 'active')
+    ON CONFLICT (hostname) DO UPDATE SET
+        ip_address = excluded.ip_address,
+        os_type = excluded.os_type,
+        os_version = excluded.os_version,
+        cpu_cores = excluded.cpu_cores,
+        memory_gb = excluded.memory_gb,
+        disk_gb = excluded.disk_gb,
+        last_seen = excluded.last_seen,
+        updated_at = CURRENT_TIMESTAMP
+    RETURNING id
+'''
+
+SQL_INSERT_DISCOVERY = '''
+    INSERT INTO discovery_history (server_id, discovery_type, data)
+    VALUES (?, 'local_discovery', ?)
+'''
+
+SQL_UPDATE_SERVER = '''
+    UPDATE servers SET
+        hostname = ?, ip_address = ?, os_type = ?, os_version = ?,
+        environment = ?, status = ?, owner = ?, location = ?, notes = ?,
+        updated_at = CURRENT_TIMESTAMP
+    WHERE id = ?
+'''
+
+SQL_DELETE_SERVER = 'DELETE FROM servers WHERE id = ?'
+
+SQL_UPDATE_APPLICATION = '''
+    UPDATE applications SET
+        name = ?, version = ?, type = ?, language = ?,
+        criticality = ?, owner = ?, notes = ?,
+        updated_at = CURRENT_TIMESTAMP
+    WHERE id = ?
+'''
+
+SQL_DELETE_APPLICATION = 'DELETE FROM applications WHERE id = ?'
+
+SQL_UPDATE_SERVICE = '''
+    UPDATE services SET
+        service_name = ?, port = ?, protocol = ?, status = ?,
+        process_name = ?, start_command = ?, config_file = ?, log_file = ?,
+        updated_at = CURRENT_TIMESTAMP
+    WHERE id = ?
+'''
+
+SQL_DELETE_SERVICE = 'DELETE FROM services WHERE id = ?'
+
+SQL_STATS_UNION = '''
+    SELECT 'servers', 'total', NULL, COUNT(*) FROM servers
+    UNION ALL
+    SELECT 'servers', 'active', NULL, COUNT(*) FROM servers WHERE status = 'active'
+    UNION ALL
+    SELECT 'servers', 'by_os', os_type, COUNT(*) FROM servers GROUP BY os_type
+    UNION ALL
+    SELECT 'servers', 'by_env', environment, COUNT(*) FROM servers
+    WHERE environment IS NOT NULL GROUP BY environment
+    UNION ALL
+    SELECT 'applications', 'total', NULL, COUNT(*) FROM applications
+    UNION ALL
+    SELECT 'applications', 'by_criticality', criticality, COUNT(*) FROM applications
+    WHERE criticality IS NOT NULL GROUP BY criticality
+    UNION ALL
+    SELECT 'services', 'total', NULL, COUNT(*) FROM services
+    UNION ALL
+    SELECT 'services', 'running', NULL, COUNT(*) FROM services WHERE status = 'running'
+    UNION ALL
+    SELECT 'dependencies', 'total', NULL, COUNT(*) FROM dependencies
+'''
+
+SQL_DISCOVERY_HISTORY = '''
+    SELECT * FROM discovery_history
+    ORDER BY discovered_at DESC
+    LIMIT 20
+'''
+
+SQL_IMPORT_SERVERS = '''
+    INSERT OR IGNORE INTO servers
+    (hostname, ip_address, os_type, os_version, environment, owner)
+    VALUES (?, ?, ?, ?, ?, ?)
+'''
+
+SQL_IMPORT_APPLICATIONS = '''
+    INSERT OR IGNORE INTO applications
+    (name, version, type, language, owner)
+    VALUES (?, ?, ?, ?, ?)
+'''
+
+# Export queries per table, with explicit columns so the CSV layout is fixed.
+# Each reads one batch of rows after a given id (keyset pagination).
+EXPORT_BATCH_SIZE = 500
+
+EXPORT_SQL = {
+    'servers': '''
+        SELECT id, hostname, ip_address, os_type, os_version, cpu_cores, memory_gb, disk_gb,
+               environment, status, location, owner, notes, last_seen, created_at, updated_at
+        FROM servers
+        WHERE id > ? ORDER BY id LIMIT ?
+    ''',
+    'applications': '''
+        SELECT id, name, version, type, language, repository_url, documentation_url,
+               owner, criticality, notes, created_at, updated_at
+        FROM applications
+        WHERE id > ? ORDER BY id LIMIT ?
+    ''',
+    'services': '''
+        SELECT id, server_id, application_id, service_name, port, protocol, status,
+               process_name, start_command, config_file, log_file, created_at, updated_at
+        FROM services
+        WHERE id > ? ORDER BY id LIMIT ?
+    ''',
+    'dependencies': '''
+        SELECT id, source_service_id, target_service_id, dependency_type, port, protocol,
+               description, created_at
+        FROM dependencies
+        WHERE id > ? ORDER BY id LIMIT ?
+    '''
+}
+
+# Columns accepted by the add endpoints: (columns, required columns, defaults)
+INSERT_SCHEMA = {
+    'servers': (
+        ['hostname', 'ip_address', 'os_type', 'os_version', 'environment', 'owner', 'notes', 'status'],
+        ['hostname'],
+        {'environment': 'production', 'status': 'active'}
+    ),
+    'applications': (
+        ['name', 'version', 'type', 'language', 'owner', 'criticality', 'notes'],
+        ['name'],
+        {'criticality': 'medium'}
+    ),
+    'services': (
+        ['server_id', 'application_id', 'service_name', 'port', 'protocol', 'status'],
+        ['server_id', 'service_name'],
+        {'protocol': 'tcp', 'status': 'running'}
+    ),
+    'dependencies': (
+        ['source_service_id', 'target_service_id', 'dependency_type', 'description'],
+        ['source_service_id', 'target_service_id'],
+        {'dependency_type': 'requires'}
+    )
+}
+
+# INSERT statements built by insert_row, keyed by (table, columns present)
+insert_sql_cache = {}
+
+def insert_row(table, data):
+    """Insert the known fields of data (plus defaults) into table and return the new row id"""
+    columns, required, defaults = INSERT_SCHEMA[table]
+
+    values = {**defaults, **{column: data[column] for column in required}}
+    values.update((column, data[column]) for column in columns if column in data)
+    present = tuple(column for column in columns if column in values)
+
+    key = (table, present)
+    if key not in insert_sql_cache:
+        insert_sql_cache[key] = 'INSERT INTO {} ({}) VALUES ({})'.format(
+            table, ', '.join(present), ', '.join('?' * len(present))
+        )
+
+    with get_conn() as conn:
+        return conn.execute(insert_sql_cache[key], [values[column] for column in present]).lastrowid
 
 def init_db():
     """Initialize the CMDB database"""
@@ -29,6 +411,10 @@ def init_db():
     conn.row_factory = sqlite3.Row
     c = conn.cursor()
 
+    # WAL lets dashboard reads proceed while discovery/imports are writing
+    for pragma in CONNECTION_PRAGMAS:
+        c.execute(pragma)
+
     # Servers table
     c.execute('''
         CREATE TABLE IF NOT EXISTS servers (
@@ -112,167 +498,159 @@ def init_db():
             id INTEGER PRIMARY KEY AUTOINCREMENT,
             server_id INTEGER,
             discovery_type TEXT,
-            data TEXT,
+            data BLOB,
             discovered_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
             FOREIGN KEY (server_id) REFERENCES servers (id) ON DELETE CASCADE
         )
     ''')
 
+    # Indexes for the columns the dashboard, detail pages and stats filter/join on
+    c.execute('CREATE INDEX IF NOT EXISTS idx_services_server ON services (server_id, application_id, service_name)')
+    c.execute('CREATE INDEX IF NOT EXISTS idx_services_app ON services (application_id)')
+    c.execute('CREATE INDEX IF NOT EXISTS idx_deps_src ON dependencies (source_service_id, target_service_id)')
+    c.execute('CREATE INDEX IF NOT EXISTS idx_deps_tgt ON dependencies (target_service_id, source_service_id)')
+    c.execute('CREATE INDEX IF NOT EXISTS idx_servers_status ON servers (status)')
+    c.execute('CREATE INDEX IF NOT EXISTS idx_servers_env ON servers (environment)')
+    c.execute('CREATE INDEX IF NOT EXISTS idx_servers_os ON servers (os_type)')
+    c.execute('CREATE INDEX IF NOT EXISTS idx_servers_created ON servers (created_at DESC, hostname, ip_address, os_type, environment, status)')
+    c.execute('CREATE INDEX IF NOT EXISTS idx_apps_crit ON applications (criticality)')
+    c.execute('CREATE INDEX IF NOT EXISTS idx_services_name ON services (service_name)')
+    c.execute('CREATE INDEX IF NOT EXISTS idx_history_server_time ON discovery_history (server_id, discovered_at DESC)')
+    c.execute('CREATE INDEX IF NOT EXISTS idx_history_time ON discovery_history (discovered_at DESC)')
+
     conn.commit()
+
+    # Refresh planner statistics so the indexes above get picked up
+    c.execute('ANALYZE')
+
     conn.close()
 
+@app.after_request
+def invalidate_cache(response):
+    """Drop cached pages after any successful write.
+
+    A read that overlaps the write can still cache what it saw, so pages may
+    be stale for up to CACHE_TIMEOUT seconds.
+    """
+    if request.method in ('POST', 'PUT', 'DELETE') and response.status_code < 400:
+        cache.clear()
+    return response
+
+# Local hostname lookups are cached briefly; the resolver can take tens of ms
+DNS_CACHE_TTL = 300
+dns_cache = {}
+
+def resolve_hostname(hostname):
+    """Resolve a hostname to an IP address, reusing recent results"""
+    cached = dns_cache.get(hostname)
+    if cached and time.monotonic() - cached[1] < DNS_CACHE_TTL:
+        return cached[0]
+
+    ip_address = socket.gethostbyname(hostname)
+    dns_cache[hostname] = (ip_address, time.monotonic())
+    return ip_address
+
+# Discovery payloads are mostly repeated process/port JSON and compress well
+DISCOVERY_COMPRESSION_LEVEL = 6
+
+def compress_discovery_data(payload):
+    """Serialize a discovery payload to a zlib-compressed JSON blob"""
+    return zlib.compress(orjson.dumps(payload), DISCOVERY_COMPRESSION_LEVEL)
+
+def decompress_discovery_data(data):
+    """Load a stored discovery payload, including rows saved as plain JSON text"""
+    if isinstance(data, bytes):
+        data = zlib.decompress(data)
+    return orjson.loads(data)
+
 # Routes
 @app.route('/')
+@cache.cached()
 def index():
     """Main dashboard"""
-    conn = sqlite3.connect(DB_PATH)
-    conn.row_factory = sqlite3.Row
-    c = conn.cursor()
-
-    # Get statistics
-    stats = {
-        'servers': c.execute('SELECT COUNT(*) FROM servers').fetchone()[0],
-        'applications': c.execute('SELECT COUNT(*) FROM applications').fetchone()[0],
-        'services': c.execute('SELECT COUNT(*) FROM services').fetchone()[0],
-        'dependencies': c.execute('SELECT COUNT(*) FROM dependencies').fetchone()[0]
-    }
+    with get_conn() as conn:
+        c = conn.cursor()
 
-    # Get recent servers
-    recent_servers = c.execute('''
-        SELECT * FROM servers
-        ORDER BY created_at DESC
-        LIMIT 5
-    ''').fetchall()
+        # Get statistics in a single round-trip
+        stats = dict(c.execute(SQL_DASHBOARD_COUNTS).fetchone())
 
-    conn.close()
+        # Get recent servers
+        recent_servers = c.execute(SQL_RECENT_SERVERS).fetchall()
 
     return render_template('dashboard.html', stats=stats, recent_servers=recent_servers)
 
 @app.route('/servers')
+@cache.cached()
 def servers():
     """List all servers"""
-    conn = sqlite3.connect(DB_PATH)
-    conn.row_factory = sqlite3.Row
-    c = conn.cursor()
-
-    servers = c.execute('SELECT * FROM servers ORDER BY hostname').fetchall()
-    conn.close()
+    with get_conn() as conn:
+        servers = conn.execute(SQL_ALL_SERVERS).fetchall()
 
     return render_template('servers.html', servers=servers)
 
 @app.route('/server/<int:server_id>')
 def server_detail(server_id):
     """Server details page"""
-    conn = sqlite3.connect(DB_PATH)
-    conn.row_factory = sqlite3.Row
-    c = conn.cursor()
-
-    server = c.execute('SELECT * FROM servers WHERE id = ?', (server_id,)).fetchone()
+    with get_conn() as conn:
+        c = conn.cursor()
 
-    services = c.execute('''
-        SELECT s.*, a.name as app_name
-        FROM services s
-        LEFT JOIN applications a ON s.application_id = a.id
-        WHERE s.server_id = ?
-    ''', (server_id,)).fetchall()
+        server = c.execute(SQL_SERVER_BY_ID, (server_id,)).fetchone()
 
-    conn.close()
+        services = c.execute(SQL_SERVER_SERVICES, (server_id,)).fetchall()
 
     return render_template('server_detail.html', server=server, services=services)
 
 @app.route('/applications')
+@cache.cached()
 def applications():
     """List all applications"""
-    conn = sqlite3.connect(DB_PATH)
-    conn.row_factory = sqlite3.Row
-    c = conn.cursor()
-
-    apps = c.execute('SELECT * FROM applications ORDER BY name').fetchall()
-    conn.close()
+    with get_conn() as conn:
+        apps = conn.execute(SQL_ALL_APPLICATIONS).fetchall()
 
     return render_template('applications.html', applications=apps)
 
 @app.route('/application/<int:app_id>')
 def application_detail(app_id):
     """Application detail page"""
-    conn = sqlite3.connect(DB_PATH)
-    conn.row_factory = sqlite3.Row
-    c = conn.cursor()
-
-    # Get application details
-    app = c.execute('SELECT * FROM applications WHERE id = ?', (app_id,)).fetchone()
+    with get_conn() as conn:
+        c = conn.cursor()
 
-    if not app:
-        conn.close()
-        return "Application not found", 404
+        # Get application details
+        app = c.execute(SQL_APPLICATION_BY_ID, (app_id,)).fetchone()
 
-    # Get services using this application
-    services = c.execute('''
-        SELECT s.*, srv.hostname
-        FROM services s
-        LEFT JOIN servers srv ON s.server_id = srv.id
-        WHERE s.application_id = ?
-    ''', (app_id,)).fetchall()
+        if not app:
+            return "Application not found", 404
 
-    conn.close()
+        # Get services using this application
+        services = c.execute(SQL_APPLICATION_SERVICES, (app_id,)).fetchall()
 
     return render_template('application_detail.html', application=app, services=services)
 
 @app.route('/services')
+@cache.cached()
 def services():
     """List all services with their relationships"""
-    conn = sqlite3.connect(DB_PATH)
-    conn.row_factory = sqlite3.Row
-    c = conn.cursor()
-
-    services_list = c.execute('''
-        SELECT s.*, srv.hostname, a.name as app_name
-        FROM services s
-        LEFT JOIN servers srv ON s.server_id = srv.id
-        LEFT JOIN applications a ON s.application_id = a.id
-        ORDER BY s.service_name
-    ''').fetchall()
-
-    conn.close()
+    with get_conn() as conn:
+        services_list = conn.execute(SQL_SERVICES_WITH_JOINS).fetchall()
 
     return render_template('services.html', services=services_list)
 
 @app.route('/service/<int:service_id>')
 def service_detail(service_id):
     """Service detail page"""
-    conn = sqlite3.connect(DB_PATH)
-    conn.row_factory = sqlite3.Row
-    c = conn.cursor()
+    with get_conn() as conn:
+        c = conn.cursor()
 
-    # Get service details with server and application info
-    service = c.execute('''
-        SELECT s.*, srv.hostname, srv.ip_address, a.name as app_name
-        FROM services s
-        LEFT JOIN servers srv ON s.server_id = srv.id
-        LEFT JOIN applications a ON s.application_id = a.id
-        WHERE s.id = ?
-    ''', (service_id,)).fetchone()
-
-    if not service:
-        conn.close()
-        return "Service not found", 404
-
-    # Get dependencies where this service is involved
-    dependencies_from = c.execute('''
-        SELECT d.*, s2.service_name as target_name
-        FROM dependencies d
-        LEFT JOIN services s2 ON d.target_service_id = s2.id
-        WHERE d.source_service_id = ?
-    ''', (service_id,)).fetchall()
-
-    dependencies_to = c.execute('''
-        SELECT d.*, s1.service_name as source_name
-        FROM dependencies d
-        LEFT JOIN services s1 ON d.source_service_id = s1.id
-        WHERE d.target_service_id = ?
-    ''', (service_id,)).fetchall()
+        # Get service details with server and application info
+        service = c.execute(SQL_SERVICE_BY_ID, (service_id,)).fetchone()
 
-    conn.close()
+        if not service:
+            return "Service not found", 404
+
+        # Get dependencies where this service is involved
+        dependencies_from = c.execute(SQL_SERVICE_DEPS_FROM, (service_id,)).fetchall()
+
+        dependencies_to = c.execute(SQL_SERVICE_DEPS_TO, (service_id,)).fetchall()
 
     return render_template('service_detail.html',
                          service=service,
@@ -280,47 +658,23 @@ def service_detail(service_id):
                          dependencies_to=dependencies_to)
 
 @app.route('/dependencies')
+@cache.cached()
 def dependencies():
     """Show service dependencies"""
-    conn = sqlite3.connect(DB_PATH)
-    conn.row_factory = sqlite3.Row
-    c = conn.cursor()
+    with get_conn() as conn:
+        c = conn.cursor()
 
-    # Get all dependencies with service names
-    deps = c.execute('''
-        SELECT d.*,
-               s1.service_name as source_name,
-               s2.service_name as target_name
-        FROM dependencies d
-        LEFT JOIN services s1 ON d.source_service_id = s1.id
-        LEFT JOIN services s2 ON d.target_service_id = s2.id
-        ORDER BY s1.service_name, s2.service_name
-    ''').fetchall()
-
-    # Get services for dropdown
-    services = c.execute('SELECT * FROM services ORDER BY service_name').fetchall()
-
-    # Get critical services (those that many depend on)
-    critical_services = c.execute('''
-        SELECT s.service_name as name, COUNT(d.id) as dep_count
-        FROM services s
-        JOIN dependencies d ON s.id = d.target_service_id
-        GROUP BY s.id
-        ORDER BY dep_count DESC
-        LIMIT 5
-    ''').fetchall()
-
-    # Get most dependent services (those that depend on many others)
-    dependent_services = c.execute('''
-        SELECT s.service_name as name, COUNT(d.id) as dep_count
-        FROM services s
-        JOIN dependencies d ON s.id = d.source_service_id
-        GROUP BY s.id
-        ORDER BY dep_count DESC
-        LIMIT 5
-    ''').fetchall()
+        # Get all dependencies with service names
+        deps = c.execute(SQL_DEPS_FULL_JOIN).fetchall()
 
-    conn.close()
+        # Get services for dropdown
+        services = c.execute(SQL_ALL_SERVICES).fetchall()
+
+        # Get critical services (those that many depend on)
+        critical_services = c.execute(SQL_CRITICAL_SERVICES).fetchall()
+
+        # Get most dependent services (those that depend on many others)
+        dependent_services = c.execute(SQL_DEPENDENT_SERVICES).fetchall()
 
     return render_template('dependencies.html',
                          dependencies=deps,
@@ -339,7 +693,8 @@ def discover_local():
     try:
         # Get system information
         hostname = socket.gethostname()
-        ip_address = socket.gethostbyname(hostname)
+        ip_address = resolve_hostname(hostname)
+        memory = psutil.virtual_memory()
 
         system_info = {
             'hostname': hostname,
@@ -347,7 +702,7 @@ def discover_local():
             'os_type': platform.system(),
             'os_version': platform.version(),
             'cpu_cores': psutil.cpu_count(),
-            'memory_gb': round(psutil.virtual_memory().total / (1024**3), 2),
+            'memory_gb': round(memory.total / (1024**3), 2),
             'disk_gb': round(psutil.disk_usage('/').total / (1024**3), 2),
             'platform': platform.platform(),
             'architecture': platform.machine(),
@@ -357,60 +712,47 @@ def discover_local():
         # Get running services (processes)
         services = []
         for proc in psutil.process_iter(['pid', 'name', 'status', 'memory_percent']):
-            try:
-                pinfo = proc.info
-                if pinfo['memory_percent'] > 0.1:  # Only significant processes
-                    services.append({
-                        'name': pinfo['name'],
-                        'pid': pinfo['pid'],
-                        'status': pinfo['status'],
-                        'memory_percent': round(pinfo['memory_percent'], 2)
-                    })
-            except (psutil.NoSuchProcess, psutil.AccessDenied):
-                pass
-
-        # Get network connections
-        connections = []
-        for conn in psutil.net_connections(kind='inet'):
-            if conn.status == 'LISTEN':
-                connections.append({
-                    'port': conn.laddr.port,
-                    'address': conn.laddr.ip,
-                    'type': 'tcp' if conn.type == 1 else 'udp'
+            pinfo = proc.info
+            if pinfo['memory_percent'] is None:  # Access denied
+                continue
+
+            if pinfo['memory_percent'] > 0.1:  # Only significant processes
+                services.append({
+                    'name': pinfo['name'],
+                    'pid': pinfo['pid'],
+                    'status': pinfo['status'],
+                    'memory_percent': round(pinfo['memory_percent'], 2)
                 })
 
-        # Store in database
-        conn = sqlite3.connect(DB_PATH)
-        c = conn.cursor()
-
-        # Insert or update server
-        c.execute('''
-            INSERT OR REPLACE INTO servers
-            (hostname, ip_address, os_type, os_version, cpu_cores, memory_gb, disk_gb, last_seen, status)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, 'active')
-        ''', (
-            hostname, ip_address, system_info['os_type'],
-            system_info['os_version'][:50] if system_info['os_version'] else 'Unknown',
-            system_info['cpu_cores'], system_info['memory_gb'],
-            system_info['disk_gb'], datetime.now()
-        ))
-
-        server_id = c.lastrowid if c.lastrowid else c.execute(
-            'SELECT id FROM servers WHERE hostname = ?', (hostname,)
-        ).fetchone()[0]
-
-        # Store discovery data
-        c.execute('''
-            INSERT INTO discovery_history (server_id, discovery_type, data)
-            VALUES (?, 'local_discovery', ?)
-        ''', (server_id, json.dumps({
-            'system': system_info,
-            'services': services[:20],  # Top 20 services
-            'connections': connections
-        })))
+        # Get listening network sockets
+        connections = [
+            {
+                'port': conn.laddr.port,
+                'address': conn.laddr.ip,
+                'type': 'tcp' if conn.type == socket.SOCK_STREAM else 'udp'
+            }
+            for conn in psutil.net_connections(kind='inet')
+            if conn.status == psutil.CONN_LISTEN
+        ]
 
-        conn.commit()
-        conn.close()
+        # Store in database
+        with get_conn() as conn:
+            c = conn.cursor()
+
+            # Insert or update server, keeping its id and any manually entered fields
+            server_id = c.execute(SQL_UPSERT_DISCOVERED_SERVER, (
+                hostname, ip_address, system_info['os_type'],
+                system_info['os_version'][:50] if system_info['os_version'] else 'Unknown',
+                system_info['cpu_cores'], system_info['memory_gb'],
+                system_info['disk_gb'], datetime.now()
+            )).fetchone()[0]
+
+            # Store discovery data
+            c.execute(SQL_INSERT_DISCOVERY, (server_id, compress_discovery_data({
+                'system': system_info,
+                'services': heapq.nlargest(20, services, key=lambda svc: svc['memory_percent']),  # Top 20 services
+                'connections': connections
+            })))
 
         return jsonify({
             'success': True,
@@ -429,55 +771,29 @@ def add_server():
     """Add a new server"""
     data = request.json
 
-    conn = sqlite3.connect(DB_PATH)
-    c = conn.cursor()
-
     try:
-        c.execute('''
-            INSERT INTO servers
-            (hostname, ip_address, os_type, os_version, environment, owner, notes, status)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-        ''', (
-            data['hostname'], data.get('ip_address'), data.get('os_type'),
-            data.get('os_version'), data.get('environment', 'production'),
-            data.get('owner'), data.get('notes'), 'active'
-        ))
-
-        conn.commit()
-        server_id = c.lastrowid
-
+        server_id = insert_row('servers', data)
         return jsonify({'success': True, 'server_id': server_id})
 
     except sqlite3.IntegrityError:
         return jsonify({'success': False, 'error': 'Server already exists'}), 400
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
-    finally:
-        conn.close()
 
 @app.route('/api/server/<int:server_id>', methods=['PUT'])
 def update_server(server_id):
     """Update server information"""
     data = request.json
 
-    conn = sqlite3.connect(DB_PATH)
-    c = conn.cursor()
-
     try:
-        c.execute('''
-            UPDATE servers SET
-                hostname = ?, ip_address = ?, os_type = ?, os_version = ?,
-                environment = ?, status = ?, owner = ?, location = ?, notes = ?,
-                updated_at = CURRENT_TIMESTAMP
-            WHERE id = ?
-        ''', (
-            data.get('hostname'), data.get('ip_address'), data.get('os_type'),
-            data.get('os_version'), data.get('environment'), data.get('status'),
-            data.get('owner'), data.get('location'), data.get('notes'),
-            server_id
-        ))
-
-        conn.commit()
+        with get_conn() as conn:
+            c = conn.cursor()
+            c.execute(SQL_UPDATE_SERVER, (
+                data.get('hostname'), data.get('ip_address'), data.get('os_type'),
+                data.get('os_version'), data.get('environment'), data.get('status'),
+                data.get('owner'), data.get('location'), data.get('notes'),
+                server_id
+            ))
 
         if c.rowcount == 0:
             return jsonify({'success': False, 'error': 'Server not found'}), 404
@@ -486,18 +802,14 @@ def update_server(server_id):
 
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
-    finally:
-        conn.close()
 
 @app.route('/api/server/<int:server_id>', methods=['DELETE'])
 def delete_server(server_id):
     """Delete a server"""
-    conn = sqlite3.connect(DB_PATH)
-    c = conn.cursor()
-
     try:
-        c.execute('DELETE FROM servers WHERE id = ?', (server_id,))
-        conn.commit()
+        with get_conn() as conn:
+            c = conn.cursor()
+            c.execute(SQL_DELETE_SERVER, (server_id,))
 
         if c.rowcount == 0:
             return jsonify({'success': False, 'error': 'Server not found'}), 404
@@ -506,63 +818,35 @@ def delete_server(server_id):
 
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
-    finally:
-        conn.close()
 
 @app.route('/api/application/add', methods=['POST'])
 def add_application():
     """Add a new application"""
     data = request.json
 
-    conn = sqlite3.connect(DB_PATH)
-    c = conn.cursor()
-
     try:
-        c.execute('''
-            INSERT INTO applications
-            (name, version, type, language, owner, criticality, notes)
-            VALUES (?, ?, ?, ?, ?, ?, ?)
-        ''', (
-            data['name'], data.get('version'), data.get('type'),
-            data.get('language'), data.get('owner'),
-            data.get('criticality', 'medium'), data.get('notes')
-        ))
-
-        conn.commit()
-        app_id = c.lastrowid
-
+        app_id = insert_row('applications', data)
         return jsonify({'success': True, 'application_id': app_id})
 
     except sqlite3.IntegrityError:
         return jsonify({'success': False, 'error': 'Application already exists'}), 400
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
-    finally:
-        conn.close()
 
 @app.route('/api/application/<int:app_id>', methods=['PUT'])
 def update_application(app_id):
     """Update application information"""
     data = request.json
 
-    conn = sqlite3.connect(DB_PATH)
-    c = conn.cursor()
-
     try:
-        c.execute('''
-            UPDATE applications SET
-                name = ?, version = ?, type = ?, language = ?,
-                criticality = ?, owner = ?, notes = ?,
-                updated_at = CURRENT_TIMESTAMP
-            WHERE id = ?
-        ''', (
-            data.get('name'), data.get('version'), data.get('type'),
-            data.get('language'), data.get('criticality'),
-            data.get('owner'), data.get('notes'),
-            app_id
-        ))
-
-        conn.commit()
+        with get_conn() as conn:
+            c = conn.cursor()
+            c.execute(SQL_UPDATE_APPLICATION, (
+                data.get('name'), data.get('version'), data.get('type'),
+                data.get('language'), data.get('criticality'),
+                data.get('owner'), data.get('notes'),
+                app_id
+            ))
 
         if c.rowcount == 0:
             return jsonify({'success': False, 'error': 'Application not found'}), 404
@@ -571,18 +855,14 @@ def update_application(app_id):
 
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
-    finally:
-        conn.close()
 
 @app.route('/api/application/<int:app_id>', methods=['DELETE'])
 def delete_application(app_id):
     """Delete an application"""
-    conn = sqlite3.connect(DB_PATH)
-    c = conn.cursor()
-
     try:
-        c.execute('DELETE FROM applications WHERE id = ?', (app_id,))
-        conn.commit()
+        with get_conn() as conn:
+            c = conn.cursor()
+            c.execute(SQL_DELETE_APPLICATION, (app_id,))
 
         if c.rowcount == 0:
             return jsonify({'success': False, 'error': 'Application not found'}), 404
@@ -591,61 +871,38 @@ def delete_application(app_id):
 
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
-    finally:
-        conn.close()
 
 @app.route('/api/service/add', methods=['POST'])
 def add_service():
     """Add a new service"""
     data = request.json
 
-    conn = sqlite3.connect(DB_PATH)
-    c = conn.cursor()
-
     try:
-        c.execute('''
-            INSERT INTO services
-            (server_id, application_id, service_name, port, protocol, status)
-            VALUES (?, ?, ?, ?, ?, ?)
-        ''', (
-            data['server_id'], data.get('application_id'),
-            data['service_name'], data.get('port'),
-            data.get('protocol', 'tcp'), data.get('status', 'running')
-        ))
-
-        conn.commit()
-        service_id = c.lastrowid
-
+        service_id = insert_row('services', data)
         return jsonify({'success': True, 'service_id': service_id})
 
+    except sqlite3.IntegrityError as e:
+        if 'FOREIGN KEY' in str(e):
+            return jsonify({'success': False, 'error': 'Server or application not found'}), 400
+        return jsonify({'success': False, 'error': 'Service name is required'}), 400
+
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
-    finally:
-        conn.close()
 
 @app.route('/api/service/<int:service_id>', methods=['PUT'])
 def update_service(service_id):
     """Update service information"""
     data = request.json
 
-    conn = sqlite3.connect(DB_PATH)
-    c = conn.cursor()
-
     try:
-        c.execute('''
-            UPDATE services SET
-                service_name = ?, port = ?, protocol = ?, status = ?,
-                process_name = ?, start_command = ?, config_file = ?, log_file = ?,
-                updated_at = CURRENT_TIMESTAMP
-            WHERE id = ?
-        ''', (
-            data.get('service_name'), data.get('port'), data.get('protocol'),
-            data.get('status'), data.get('process_name'), data.get('start_command'),
-            data.get('config_file'), data.get('log_file'),
-            service_id
-        ))
-
-        conn.commit()
+        with get_conn() as conn:
+            c = conn.cursor()
+            c.execute(SQL_UPDATE_SERVICE, (
+                data.get('service_name'), data.get('port'), data.get('protocol'),
+                data.get('status'), data.get('process_name'), data.get('start_command'),
+                data.get('config_file'), data.get('log_file'),
+                service_id
+            ))
 
         if c.rowcount == 0:
             return jsonify({'success': False, 'error': 'Service not found'}), 404
@@ -654,18 +911,14 @@ def update_service(service_id):
 
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
-    finally:
-        conn.close()
 
 @app.route('/api/service/<int:service_id>', methods=['DELETE'])
 def delete_service(service_id):
     """Delete a service"""
-    conn = sqlite3.connect(DB_PATH)
-    c = conn.cursor()
-
     try:
-        c.execute('DELETE FROM services WHERE id = ?', (service_id,))
-        conn.commit()
+        with get_conn() as conn:
+            c = conn.cursor()
+            c.execute(SQL_DELETE_SERVICE, (service_id,))
 
         if c.rowcount == 0:
             return jsonify({'success': False, 'error': 'Service not found'}), 404
@@ -674,114 +927,89 @@ def delete_service(service_id):
 
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
-    finally:
-        conn.close()
 
 @app.route('/api/dependency/add', methods=['POST'])
 def add_dependency():
     """Add a service dependency"""
     data = request.json
 
-    conn = sqlite3.connect(DB_PATH)
-    c = conn.cursor()
-
     try:
-        c.execute('''
-            INSERT INTO dependencies
-            (source_service_id, target_service_id, dependency_type, description)
-            VALUES (?, ?, ?, ?)
-        ''', (
-            data['source_service_id'], data['target_service_id'],
-            data.get('dependency_type', 'requires'), data.get('description')
-        ))
-
-        conn.commit()
-
+        insert_row('dependencies', data)
         return jsonify({'success': True})
 
+    except sqlite3.IntegrityError:
+        return jsonify({'success': False, 'error': 'Source or target service not found'}), 400
+
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
-    finally:
-        conn.close()
 
 @app.route('/api/stats')
+@cache.cached()
 def api_stats():
     """Get CMDB statistics"""
-    conn = sqlite3.connect(DB_PATH)
-    conn.row_factory = sqlite3.Row
-    c = conn.cursor()
-
     stats = {
-        'servers': {
-            'total': c.execute('SELECT COUNT(*) FROM servers').fetchone()[0],
-            'active': c.execute("SELECT COUNT(*) FROM servers WHERE status='active'").fetchone()[0],
-            'by_os': dict(c.execute('SELECT os_type, COUNT(*) FROM servers GROUP BY os_type').fetchall()),
-            'by_env': dict(c.execute('SELECT environment, COUNT(*) FROM servers WHERE environment IS NOT NULL GROUP BY environment').fetchall())
-        },
-        'applications': {
-            'total': c.execute('SELECT COUNT(*) FROM applications').fetchone()[0],
-            'by_criticality': dict(c.execute('SELECT criticality, COUNT(*) FROM applications WHERE criticality IS NOT NULL GROUP BY criticality').fetchall())
-        },
-        'services': {
-            'total': c.execute('SELECT COUNT(*) FROM services').fetchone()[0],
-            'running': c.execute("SELECT COUNT(*) FROM services WHERE status='running'").fetchone()[0]
-        },
-        'dependencies': {
-            'total': c.execute('SELECT COUNT(*) FROM dependencies').fetchone()[0]
-        }
+        'servers': {'by_os': {}, 'by_env': {}},
+        'applications': {'by_criticality': {}},
+        'services': {},
+        'dependencies': {}
     }
 
-    conn.close()
+    # Every counter comes back as a (section, key, group, value) row of one query
+    with get_conn() as conn:
+        rows = conn.execute(SQL_STATS_UNION).fetchall()
+
+    for section, key, group, value in rows:
+        if key in stats[section]:
+            stats[section][key][group] = value
+        else:
+            stats[section][key] = value
 
     return jsonify(stats)
 
 @app.route('/api/discovery/history')
 def discovery_history():
     """Get discovery history"""
-    conn = sqlite3.connect(DB_PATH)
-    conn.row_factory = sqlite3.Row
-    c = conn.cursor()
-
-    history = c.execute('''
-        SELECT * FROM discovery_history
-        ORDER BY created_at DESC
-        LIMIT 20
-    ''').fetchall()
-
-    conn.close()
+    with get_conn() as conn:
+        history = conn.execute(SQL_DISCOVERY_HISTORY).fetchall()
 
     return jsonify({
-        'history': [dict(h) for h in history]
+        'history': [dict(h, data=decompress_discovery_data(h['data'])) for h in history]
     })
 
 @app.route('/api/export/<table>')
 def export_table(table):
     """Export table data as CSV"""
-    if table not in ['servers', 'applications', 'services', 'dependencies']:
+    if table not in EXPORT_SQL:
         return jsonify({'error': 'Invalid table'}), 400
 
-    conn = sqlite3.connect(DB_PATH)
-    conn.row_factory = sqlite3.Row
-    c = conn.cursor()
-
-    rows = c.execute(f'SELECT * FROM {table}').fetchall()
-
-    # Create CSV
-    output = io.StringIO()
-    if rows:
-        writer = csv.writer(output)
-        writer.writerow(rows[0].keys())  # Headers
-        writer.writerows([list(row) for row in rows])
-
-    conn.close()
-
-    # Create response
-    output.seek(0)
-    return send_file(
-        io.BytesIO(output.getvalue().encode()),
+    def generate():
+        # Rows are read in batches and the pooled connection is returned
+        # before each batch is sent, so a slow client never holds it
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        last_id = 0
+
+        while True:
+            with get_conn() as conn:
+                cursor = conn.execute(EXPORT_SQL[table], (last_id, EXPORT_BATCH_SIZE))
+                rows = cursor.fetchall()
+
+            if last_id == 0:
+                writer.writerow([column[0] for column in cursor.description])  # Headers
+            writer.writerows(rows)
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+
+            if len(rows) < EXPORT_BATCH_SIZE:
+                break
+            last_id = rows[-1]['id']
+
+    filename = f'{table}_export_{datetime.now().strftime("%Y%m%d_%H%M%S")}.csv'
+    return Response(
+        generate(),
         mimetype='text/csv',
-        as_attachment=True,
-        download_name=f'{table}_export_{datetime.now().strftime("%Y%m%d_%H%M%S")}.csv'
+        headers={'Content-Disposition': f'attachment; filename={filename}'}
     )
 
 @app.route('/api/import/<table>', methods=['POST'])
@@ -798,55 +1026,50 @@ def import_table(table):
     stream = io.StringIO(file.stream.read().decode("UTF8"), newline=None)
     csv_reader = csv.DictReader(stream)
 
-    conn = sqlite3.connect(DB_PATH)
-    c = conn.cursor()
+    if table == 'servers':
+        sql = SQL_IMPORT_SERVERS
+        rows = [(
+            row.get('hostname'), row.get('ip_address'),
+            row.get('os_type'), row.get('os_version'),
+            row.get('environment'), row.get('owner')
+        ) for row in csv_reader]
+    else:
+        sql = SQL_IMPORT_APPLICATIONS
+        rows = [(
+            row.get('name'), row.get('version'),
+            row.get('type'), row.get('language'), row.get('owner')
+        ) for row in csv_reader]
 
-    imported = 0
-    errors = []
+    # The file is imported all-or-nothing: any failure rolls back every row
+    try:
+        with get_conn() as conn:
+            c = conn.cursor()
 
-    for row in csv_reader:
-        try:
-            if table == 'servers':
-                c.execute('''
-                    INSERT OR IGNORE INTO servers
-                    (hostname, ip_address, os_type, os_version, environment, owner)
-                    VALUES (?, ?, ?, ?, ?, ?)
-                ''', (
-                    row.get('hostname'), row.get('ip_address'),
-                    row.get('os_type'), row.get('os_version'),
-                    row.get('environment'), row.get('owner')
-                ))
-            elif table == 'applications':
-                c.execute('''
-                    INSERT OR IGNORE INTO applications
-                    (name, version, type, language, owner)
-                    VALUES (?, ?, ?, ?, ?)
-                ''', (
-                    row.get('name'), row.get('version'),
-                    row.get('type'), row.get('language'), row.get('owner')
-                ))
-
-            if c.rowcount > 0:
-                imported += 1
-
-        except Exception as e:
-            errors.append(f"Row error: {str(e)}")
+            # Take the write lock once for the whole file instead of per row
+            c.execute('BEGIN IMMEDIATE')
+            c.executemany(sql, rows)
+            imported = c.rowcount
 
-    conn.commit()
-    conn.close()
+    except Exception as e:
+        return jsonify({'success': False, 'imported': 0, 'error': str(e)}), 500
 
     return jsonify({
         'success': True,
         'imported': imported,
-        'errors': errors
+        'errors': []
     })
 
 if __name__ == '__main__':
     init_db()
 
+    # Turn SIGTERM (docker stop) into a normal exit so the pool is checkpointed
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+
     port = int(os.environ.get('PORT', 5000))
     # Check if running in Docker
     if os.environ.get('DOCKER_CONTAINER'):
-        app.run(host='0.0.0.0', port=port, debug=False)
+        # Serve with a thread per pooled connection instead of the dev server
+        from waitress import serve
+        serve(app, host='0.0.0.0', port=port, threads=DB_POOL_SIZE)
     else:
         app.run(host='0.0.0.0', port=port, debug=True)
\ No newline at end of file
@@ -4,13 +4,14 @@ Demo data generator for Simple CMDB
 Populates the database with sample data for demonstration
 """
 
+import os
 import sqlite3
 import random
 from datetime import datetime, timedelta
 
 def create_demo_data():
     """Create demo data in the CMDB database"""
-    conn = sqlite3.connect('cmdb.db')
+    conn = sqlite3.connect(os.environ.get('DATABASE_PATH', 'cmdb.db'))
     cursor = conn.cursor()
 
     print("Adding demo servers...")
@@ -29,11 +30,10 @@ def create_demo_data():
         ('ci-cd-01', '10.0.6.10', 'Linux', 'Ubuntu 22.04', 'production', 'active', 'DevOps Team', 'Jenkins CI/CD server'),
     ]
 
-    for server in servers:
-        cursor.execute('''
-            INSERT OR IGNORE INTO servers (hostname, ip_address, os_type, os_version, environment, status, owner, notes)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-        ''', server)
+    cursor.executemany('''
+        INSERT OR IGNORE INTO servers (hostname, ip_address, os_type, os_version, environment, status, owner, notes)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+    ''', servers)
 
     print("Adding demo applications...")
     applications = [
@@ -51,76 +51,91 @@ def create_demo_data():
         ('Backup Manager', '2.0.1', 'utility', 'Python', 'high', 'Ops Team', 'Backup automation'),
     ]
 
-    for app in applications:
-        cursor.execute('''
-            INSERT OR IGNORE INTO applications (name, version, type, language, criticality, owner, notes)
-            VALUES (?, ?, ?, ?, ?, ?, ?)
-        ''', app)
+    cursor.executemany('''
+        INSERT OR IGNORE INTO applications (name, version, type, language, criticality, owner, notes)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+    ''', applications)
 
     print("Adding demo services...")
-    # Get server and application IDs
-    cursor.execute('SELECT id, hostname FROM servers')
-    server_map = {hostname: id for id, hostname in cursor.fetchall()}
-
-    cursor.execute('SELECT id, name FROM applications')
-    app_map = {name: id for id, name in cursor.fetchall()}
-
+    # Services reference servers and applications by name; the ids are
+    # resolved by joining a staging table instead of per-row lookups
     services = [
-        ('nginx-web', server_map.get('web-prod-01'), app_map.get('Nginx'), 80, 'http', 'running'),
-        ('nginx-ssl', server_map.get('web-prod-01'), app_map.get('Nginx'), 443, 'https', 'running'),
-        ('ecommerce-app', server_map.get('web-prod-01'), app_map.get('E-Commerce Platform'), 8080, 'http', 'running'),
-        ('customer-api', server_map.get('web-prod-02'), app_map.get('Customer API'), 5000, 'http', 'running'),
-        ('payment-service', server_map.get('web-prod-02'), app_map.get('Payment Gateway'), 8443, 'https', 'running'),
-        ('mysql-primary', server_map.get('db-prod-01'), app_map.get('MySQL Database'), 3306, 'tcp', 'running'),
-        ('mysql-replica', server_map.get('db-prod-02'), app_map.get('MySQL Database'), 3306, 'tcp', 'running'),
-        ('redis-cache', server_map.get('cache-prod-01'), app_map.get('Redis Cache'), 6379, 'tcp', 'running'),
-        ('elasticsearch', server_map.get('monitor-01'), app_map.get('Elasticsearch'), 9200, 'http', 'running'),
-        ('prometheus', server_map.get('monitor-01'), app_map.get('Prometheus'), 9090, 'http', 'running'),
-        ('grafana', server_map.get('monitor-01'), app_map.get('Grafana'), 3000, 'http', 'running'),
-        ('rabbitmq', server_map.get('app-staging-01'), app_map.get('RabbitMQ'), 5672, 'tcp', 'running'),
-        ('jenkins', server_map.get('ci-cd-01'), app_map.get('Jenkins'), 8080, 'http', 'running'),
-        ('backup-service', server_map.get('backup-01'), app_map.get('Backup Manager'), 9001, 'tcp', 'running'),
+        ('nginx-web', 'web-prod-01', 'Nginx', 80, 'http', 'running'),
+        ('nginx-ssl', 'web-prod-01', 'Nginx', 443, 'https', 'running'),
+        ('ecommerce-app', 'web-prod-01', 'E-Commerce Platform', 8080, 'http', 'running'),
+        ('customer-api', 'web-prod-02', 'Customer API', 5000, 'http', 'running'),
+        ('payment-service', 'web-prod-02', 'Payment Gateway', 8443, 'https', 'running'),
+        ('mysql-primary', 'db-prod-01', 'MySQL Database', 3306, 'tcp', 'running'),
+        ('mysql-replica', 'db-prod-02', 'MySQL Database', 3306, 'tcp', 'running'),
+        ('redis-cache', 'cache-prod-01', 'Redis Cache', 6379, 'tcp', 'running'),
+        ('elasticsearch', 'monitor-01', 'Elasticsearch', 9200, 'http', 'running'),
+        ('prometheus', 'monitor-01', 'Prometheus', 9090, 'http', 'running'),
+        ('grafana', 'monitor-01', 'Grafana', 3000, 'http', 'running'),
+        ('rabbitmq', 'app-staging-01', 'RabbitMQ', 5672, 'tcp', 'running'),
+        ('jenkins', 'ci-cd-01', 'Jenkins', 8080, 'http', 'running'),
+        ('backup-service', 'backup-01', 'Backup Manager', 9001, 'tcp', 'running'),
     ]
 
-    service_ids = {}
-    for service in services:
-        cursor.execute('''
-            INSERT OR IGNORE INTO services (service_name, server_id, application_id, port, protocol, status)
-            VALUES (?, ?, ?, ?, ?, ?)
-        ''', service)
-        service_ids[service[0]] = cursor.lastrowid
+    cursor.execute('''
+        CREATE TEMP TABLE demo_services_src (
+            name TEXT, hostname TEXT, app_name TEXT, port INTEGER, protocol TEXT, status TEXT
+        )
+    ''')
+    cursor.executemany('INSERT INTO demo_services_src VALUES (?, ?, ?, ?, ?, ?)', services)
+    cursor.execute('''
+        INSERT OR IGNORE INTO services (service_name, server_id, application_id, port, protocol, status)
+        SELECT d.name, s.id, a.id, d.port, d.protocol, d.status
+        FROM demo_services_src d
+        LEFT JOIN servers s ON s.hostname = d.hostname
+        LEFT JOIN applications a ON a.name = d.app_name
+        ORDER BY d.rowid
+    ''')
 
     print("Adding demo dependencies...")
-    # Get service IDs
-    cursor.execute('SELECT id, service_name FROM services')
-    service_map = {name: id for id, name in cursor.fetchall()}
-
     dependencies = [
-        (service_map.get('ecommerce-app'), service_map.get('customer-api'), 'E-commerce app calls customer API'),
-        (service_map.get('ecommerce-app'), service_map.get('payment-service'), 'E-commerce app uses payment service'),
-        (service_map.get('ecommerce-app'), service_map.get('mysql-primary'), 'E-commerce app connects to database'),
-        (service_map.get('ecommerce-app'), service_map.get('redis-cache'), 'E-commerce app uses Redis for caching'),
-        (service_map.get('customer-api'), service_map.get('mysql-primary'), 'Customer API reads from database'),
-        (service_map.get('payment-service'), service_map.get('mysql-primary'), 'Payment service stores transactions'),
-        (service_map.get('payment-service'), service_map.get('rabbitmq'), 'Payment service sends messages to queue'),
-        (service_map.get('nginx-web'), service_map.get('ecommerce-app'), 'Nginx proxies to e-commerce app'),
-        (service_map.get('nginx-ssl'), service_map.get('ecommerce-app'), 'Nginx SSL proxies to e-commerce app'),
-        (service_map.get('mysql-replica'), service_map.get('mysql-primary'), 'Database replication'),
-        (service_map.get('prometheus'), service_map.get('ecommerce-app'), 'Prometheus scrapes metrics'),
-        (service_map.get('prometheus'), service_map.get('customer-api'), 'Prometheus scrapes metrics'),
-        (service_map.get('grafana'), service_map.get('prometheus'), 'Grafana queries Prometheus'),
-        (service_map.get('backup-service'), service_map.get('mysql-primary'), 'Backup service backs up database'),
-        (service_map.get('elasticsearch'), service_map.get('ecommerce-app'), 'Elasticsearch indexes app logs'),
+        ('ecommerce-app', 'customer-api', 'E-commerce app calls customer API'),
+        ('ecommerce-app', 'payment-service', 'E-commerce app uses payment service'),
+        ('ecommerce-app', 'mysql-primary', 'E-commerce app connects to database'),
+        ('ecommerce-app', 'redis-cache', 'E-commerce app uses Redis for caching'),
+        ('customer-api', 'mysql-primary', 'Customer API reads from database'),
+        ('payment-service', 'mysql-primary', 'Payment service stores transactions'),
+        ('payment-service', 'rabbitmq', 'Payment service sends messages to queue'),
+        ('nginx-web', 'ecommerce-app', 'Nginx proxies to e-commerce app'),
+        ('nginx-ssl', 'ecommerce-app', 'Nginx SSL proxies to e-commerce app'),
+        ('mysql-replica', 'mysql-primary', 'Database replication'),
+        ('prometheus', 'ecommerce-app', 'Prometheus scrapes metrics'),
+        ('prometheus', 'customer-api', 'Prometheus scrapes metrics'),
+        ('grafana', 'prometheus', 'Grafana queries Prometheus'),
+        ('backup-service', 'mysql-primary', 'Backup service backs up database'),
+        ('elasticsearch', 'ecommerce-app', 'Elasticsearch indexes app logs'),
     ]
 
-    for dep in dependencies:
-        if dep[0] and dep[1]:  # Only insert if both IDs exist
-            cursor.execute('''
-                INSERT OR IGNORE INTO dependencies (source_service_id, target_service_id, description)
-                VALUES (?, ?, ?)
-            ''', dep)
-
+    cursor.execute('''
+        CREATE TEMP TABLE demo_dependencies_src (
+            source_name TEXT, target_name TEXT, description TEXT
+        )
+    ''')
+    cursor.executemany('INSERT INTO demo_dependencies_src VALUES (?, ?, ?)', dependencies)
+
+    # Inner joins only insert dependencies whose services both exist; service
+    # names are not unique, so the newest service with each name is used
+    cursor.execute('''
+        INSERT OR IGNORE INTO dependencies (source_service_id, target_service_id, description)
+        SELECT s1.id, s2.id, d.description
+        FROM demo_dependencies_src d
+        JOIN (SELECT service_name, MAX(id) AS id FROM services GROUP BY service_name) s1
+            ON s1.service_name = d.source_name
+        JOIN (SELECT service_name, MAX(id) AS id FROM services GROUP BY service_name) s2
+            ON s2.service_name = d.target_name
+        ORDER BY d.rowid
+    ''')
+    dependency_count = cursor.rowcount
+
+    # All inserts above share one implicit transaction, committed once here
     conn.commit()
+
+    # Refresh planner statistics now that the tables hold real data
+    cursor.execute('ANALYZE')
     conn.close()
 
     print("\n✅ Demo data added successfully!")
@@ -128,7 +143,7 @@ def create_demo_data():
     print(f"  - {len(servers)} servers")
     print(f"  - {len(applications)} applications")
     print(f"  - {len(services)} services")
-    print(f"  - {len([d for d in dependencies if d[0] and d[1]])} dependencies")
+    print(f"  - {dependency_count} dependencies")
     print("\nYou can now start the application with: python app.py")
 
 if __name__ == '__main__':